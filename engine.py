@@ -0,0 +1,393 @@
+"""Scenarios, schemas and prompts shared by the Streamlit app and offline scripts."""
+import os
+import json
+import hashlib
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib when orjson isn't installed
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:  # Only needed when strict structured output is turned off
+    fastjsonschema = None
+
+# ==========================================
+# ENVIRONMENT
+# ==========================================
+def load_api_key():
+    """Read CEREBRAS_API_KEY, falling back to .env only while the key is missing.
+
+    Once found, the key sits in os.environ and .env is never searched again. A missing
+    key is not remembered, so adding .env and refreshing the page recovers without a restart.
+    """
+    api_key = os.environ.get("CEREBRAS_API_KEY")
+    if not api_key:
+        load_dotenv()
+        api_key = os.environ.get("CEREBRAS_API_KEY")
+    return api_key
+
+# ==========================================
+# JSON HELPERS
+# ==========================================
+def json_loads(data):
+    """Parse JSON from str or bytes (orjson errors subclass json.JSONDecodeError)"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(obj, pretty=False, sort_keys=False):
+    """Serialize to UTF-8 bytes"""
+    if orjson:
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if pretty else None, sort_keys=sort_keys).encode("utf-8")
+
+# ==========================================
+# DEMO SCENARIOS
+# ==========================================
+DEMO_SCENARIOS = {
+    "Software Agency Crisis": {
+        "business_type": "High-end Software Agency",
+        "current_rule": "All client change requests must be approved by both the Founder (Revenue Protector) and Lead Architect (Quality Gatekeeper).",
+        "scenario": "A major client threatens to walk away if a high-risk/high-reward feature is not delivered in 7 days. The feature requires bypassing standard QA protocols."
+    },
+    "Logistics Company Fuel Crisis": {
+        "business_type": "Mid-sized Regional Logistics/Trucking Company",
+        "current_rule": "Strict driver safety policy: Mandatory 10-hour rest break for every 14 hours on duty. No exceptions.",
+        "scenario": "Fuel prices spike 40%. Major client demands 'Guaranteed 24-Hour Delivery' with strict penalty clauses. Drivers are pressured to skip rest breaks."
+    },
+    "Healthcare Staffing Shortage": {
+        "business_type": "Regional Hospital Network",
+        "current_rule": "Mandatory nurse-to-patient ratios (1:4 in general care, 1:2 in ICU). No nurse can work more than 12-hour shifts.",
+        "scenario": "Flu outbreak causes 30% staff shortage. Emergency room wait times hit 8 hours. Administration considers suspending ratio requirements."
+    },
+    "E-commerce Black Friday": {
+        "business_type": "Fast-growing E-commerce Startup",
+        "current_rule": "All marketing campaigns must be approved by Legal team for compliance (data privacy, accessibility, claims verification).",
+        "scenario": "Black Friday is in 48 hours. Marketing team has explosive viral campaign ready but Legal hasn't approved it. Competitors are already running similar campaigns."
+    },
+    "Manufacturing Quality Crisis": {
+        "business_type": "Electronics Manufacturing Plant",
+        "current_rule": "Zero-defect policy: Any product with defects must be scrapped. Quality inspectors have authority to halt production lines.",
+        "scenario": "Major retailer threatens to cancel $10M order if shipment is delayed by even 1 day. Current defect rate is 3% (normally 0.5%). Production manager wants to ship anyway."
+    }
+}
+
+# ==========================================
+# JSON SCHEMAS (Strict Adherence)
+# ==========================================
+
+SPECTRUM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "critical_conflict": {
+            "type": "object",
+            "properties": {
+                "psychological_prior": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "scale_description": {"type": "string"}
+                    },
+                    "required": ["name", "scale_description"],
+                    "additionalProperties": False
+                },
+                "operational_constraint": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "description": {"type": "string"}
+                    },
+                    "required": ["name", "description"],
+                    "additionalProperties": False
+                }
+            },
+            "required": ["psychological_prior", "operational_constraint"],
+            "additionalProperties": False
+        },
+        "agent_spectrum": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "agent_id": {"type": "string"},
+                    "prior_score": {"type": "integer"},
+                    "persona": {"type": "string"},
+                    "description": {"type": "string"}
+                },
+                "required": ["agent_id", "prior_score", "persona", "description"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["critical_conflict", "agent_spectrum"],
+    "additionalProperties": False
+}
+
+SIMULATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "timeline": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "time_step": {"type": "string"},
+                    "agent_activity": {"type": "string"},
+                    "approval_status": {"type": "string"},
+                    "system_risk_score": {"type": "integer"},
+                    "narrative_outcome": {"type": "string"}
+                },
+                "required": ["time_step", "agent_activity", "approval_status", "system_risk_score", "narrative_outcome"],
+                "additionalProperties": False
+            }
+        },
+        "tipping_point": {
+            "type": "object",
+            "properties": {
+                "day": {"type": "string"},
+                "description": {"type": "string"}
+            },
+            "required": ["day", "description"],
+            "additionalProperties": False
+        }
+    },
+    "required": ["timeline", "tipping_point"],
+    "additionalProperties": False
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "structural_patterns": {
+            "type": "object",
+            "properties": {
+                "fracture": {"type": "string"},
+                "tipping_point": {"type": "string"},
+                "mechanism_of_failure": {"type": "string"}
+            },
+            "required": ["fracture", "tipping_point", "mechanism_of_failure"],
+            "additionalProperties": False
+        },
+        "diagnosis": {
+            "type": "object",
+            "properties": {
+                "mechanism_failure": {"type": "string"},
+                "driver_failure": {"type": "string"}
+            },
+            "required": ["mechanism_failure", "driver_failure"],
+            "additionalProperties": False
+        },
+        "proposed_solutions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "solution_name": {"type": "string"},
+                    "description": {"type": "string"},
+                    "implementation": {"type": "string"},
+                    "prescriptive_action_plan": {"type": "string"}
+                },
+                "required": ["solution_name", "description", "implementation", "prescriptive_action_plan"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["structural_patterns", "diagnosis", "proposed_solutions"],
+    "additionalProperties": False
+}
+
+# ==========================================
+# MODEL ROUTING
+# ==========================================
+# Spectrum generation is a simple structured task, so it goes to the faster 8B model;
+# the simulation and analysis keep the 70B model for reasoning depth
+QUALITY_MODEL = "llama-3.3-70b"
+SPECTRUM_MODEL = "llama3.1-8b"
+SIMULATION_MODEL = QUALITY_MODEL
+ANALYSIS_MODEL = QUALITY_MODEL
+
+# In strict mode Cerebras guarantees schema-conformant output, so responses are
+# trusted as-is; client-side validation only runs when strict mode is off
+STRICT_OUTPUT = True
+
+# Built once per process and passed straight to the API on every call
+def _response_format(schema, schema_name):
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema_name,
+            "strict": STRICT_OUTPUT,
+            "schema": schema
+        }
+    }
+
+SPECTRUM_RESPONSE_FORMAT = _response_format(SPECTRUM_SCHEMA, "spectrum_schema")
+SIMULATION_RESPONSE_FORMAT = _response_format(SIMULATION_SCHEMA, "simulation_schema")
+ANALYSIS_RESPONSE_FORMAT = _response_format(ANALYSIS_SCHEMA, "analysis_schema")
+
+def _compile_validator(response_format):
+    if response_format["json_schema"]["strict"]:
+        return None
+    if fastjsonschema is None:
+        # Without strict mode or a validator, responses would be neither trusted nor checked
+        raise ImportError("fastjsonschema is required when STRICT_OUTPUT is False")
+    return fastjsonschema.compile(response_format["json_schema"]["schema"])
+
+# Compiled once at import, keyed by schema name
+RESPONSE_VALIDATORS = {
+    rf["json_schema"]["name"]: _compile_validator(rf)
+    for rf in (SPECTRUM_RESPONSE_FORMAT, SIMULATION_RESPONSE_FORMAT, ANALYSIS_RESPONSE_FORMAT)
+}
+
+def validate_response(result, response_format):
+    """Check a parsed response against its schema when strict mode isn't enforcing it"""
+    validator = RESPONSE_VALIDATORS.get(response_format["json_schema"]["name"])
+    if validator is not None:
+        validator(result)
+    return result
+
+# ==========================================
+# PROMPTS
+# ==========================================
+# Fixed instructions live in the system prompts so every request shares an identical
+# prefix (and hits the provider's prefix cache); per-scenario data goes in the user message.
+
+SPECTRUM_SYSTEM_PROMPT = """You are a business systems analyst acting as a Complexity Analyst. Generate realistic agent profiles.
+
+You will be given a business scenario (business type, current rule and crisis).
+
+Task:
+1. Identify the most critical psychological Prior (belief) and Operational Constraint in conflict.
+2. Generate a spectrum of 10 agents with a bimodal distribution (4 high adherence, 4 low adherence, 2 neutral).
+3. Assign each agent a persona and prior score (1-10 scale).
+
+Output must strictly follow the JSON schema."""
+
+SIMULATION_SYSTEM_PROMPT = """You are a dynamic simulation engine. Generate time-step narratives showing risk accumulation.
+
+You will be given a business context, the rule under stress, the critical conflict, the agents and the number of days to simulate.
+
+Task:
+Simulate the agents' interactions day by day for the requested number of days.
+Track:
+1. Activity & Decisions
+2. Approval Status (Approved/Delayed/Bypassed)
+3. System Risk Score (Start 0. Add +2 for protests/delays, +10 for bypasses/violations).
+4. Narrative outcome.
+
+Identify the specific Tipping Point day."""
+
+ANALYSIS_SYSTEM_PROMPT = """You are a structural analyst. Provide deep system diagnostics and prescriptive, actionable fixes.
+
+You will be given a business type and a simulation log.
+
+Task:
+1. Extract structural patterns (fracture, tipping point, failure mechanism).
+2. Diagnose mechanism and driver failures.
+3. Propose structural solutions.
+CRITICAL: For each solution, provide a 'prescriptive_action_plan' containing specific metrics, bonuses, or exact rule changes (The 'How-To' layer)."""
+
+def _cell(value):
+    """Make a value safe for the one-row-per-line tables below.
+
+    Newlines and tabs (the row and timeline column separators) collapse to single
+    spaces, and "|" (the agent column separator) is escaped as "\\|".
+    """
+    return " ".join(str(value).split()).replace("|", "\\|")
+
+def format_agents(agents):
+    """Compact pipe-separated agent table (far fewer tokens than indented JSON)"""
+    rows = ["agent_id|prior_score|persona|description"]
+    rows.extend(
+        f"{_cell(a['agent_id'])}|{a['prior_score']}|{_cell(a['persona'])}|{_cell(a['description'])}"
+        for a in agents
+    )
+    return "\n".join(rows)
+
+def format_simulation(simulation):
+    """Compact tab-separated timeline plus the tipping point"""
+    rows = ["time_step\tagent_activity\tapproval_status\tsystem_risk_score\tnarrative_outcome"]
+    rows.extend(
+        f"{_cell(e['time_step'])}\t{_cell(e['agent_activity'])}\t{_cell(e['approval_status'])}"
+        f"\t{e['system_risk_score']}\t{_cell(e['narrative_outcome'])}"
+        for e in simulation['timeline']
+    )
+    tipping_point = simulation['tipping_point']
+    rows.append(f"Tipping Point: {_cell(tipping_point['day'])} - {_cell(tipping_point['description'])}")
+    return "\n".join(rows)
+
+def build_spectrum_messages(context):
+    prompt = f"""Business Type: {context['business_type']}
+Current Rule: {context['current_rule']}
+Crisis: {context['scenario']}"""
+
+    return [
+        {"role": "system", "content": SPECTRUM_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+DEFAULT_SIMULATION_DAYS = 5
+
+def build_simulation_messages(context, spectrum, simulation_days):
+    prompt = f"""Context: {context['business_type']} | {context['scenario']}
+Rule: {context['current_rule']}
+Conflict: {spectrum['critical_conflict']['psychological_prior']['name']} vs {spectrum['critical_conflict']['operational_constraint']['name']}
+
+Agents:
+{format_agents(spectrum['agent_spectrum'])}
+
+Run a {simulation_days}-day simulation."""
+
+    return [
+        {"role": "system", "content": SIMULATION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def build_analysis_messages(context, simulation):
+    prompt = f"""Business: {context['business_type']}
+Simulation:
+{format_simulation(simulation)}"""
+
+    return [
+        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+# ==========================================
+# PRECOMPUTED DEMOS
+# ==========================================
+DEMO_DIR = Path(__file__).parent / "demos"
+
+# Fingerprint of everything that shapes a demo's output: changing any of it orphans the
+# precomputed demos until scripts/precompute_demos.py re-runs. Stdlib json keeps the
+# digest identical whether or not orjson is installed.
+DEMO_FINGERPRINT = hashlib.sha256(json.dumps([
+    DEMO_SCENARIOS,
+    SPECTRUM_RESPONSE_FORMAT,
+    SIMULATION_RESPONSE_FORMAT,
+    ANALYSIS_RESPONSE_FORMAT,
+    SPECTRUM_SYSTEM_PROMPT,
+    SIMULATION_SYSTEM_PROMPT,
+    ANALYSIS_SYSTEM_PROMPT,
+    SPECTRUM_MODEL,
+    SIMULATION_MODEL,
+    ANALYSIS_MODEL,
+    DEFAULT_SIMULATION_DAYS,
+], sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def demo_slug(demo_name):
+    return "-".join("".join(ch if ch.isalnum() else " " for ch in demo_name.lower()).split())
+
+def demo_path(demo_name):
+    return DEMO_DIR / f"{demo_slug(demo_name)}-{DEMO_FINGERPRINT}.json"
+
+def load_demo(demo_name):
+    """Return the precomputed {context, spectrum, simulation, analysis} for a demo, or None"""
+    try:
+        return json_loads(demo_path(demo_name).read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,80 @@
+"""Precompute the three LLM phases for every demo scenario.
+
+Writes demos/<slug>-<fingerprint>.json so the demo buttons in the app can load
+a finished report without calling the API. Re-run whenever the scenarios,
+schemas or prompts in engine.py change.
+
+Usage: python scripts/precompute_demos.py
+"""
+import sys
+from pathlib import Path
+
+from cerebras.cloud.sdk import Cerebras
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import (  # noqa: E402
+    DEMO_DIR,
+    DEMO_SCENARIOS,
+    SPECTRUM_RESPONSE_FORMAT,
+    SIMULATION_RESPONSE_FORMAT,
+    ANALYSIS_RESPONSE_FORMAT,
+    DEFAULT_SIMULATION_DAYS,
+    SPECTRUM_MODEL,
+    SIMULATION_MODEL,
+    ANALYSIS_MODEL,
+    build_spectrum_messages,
+    build_simulation_messages,
+    build_analysis_messages,
+    demo_path,
+    demo_slug,
+    json_loads,
+    json_dumps,
+    load_api_key,
+    validate_response,
+)
+
+
+def complete(client, messages, response_format, model):
+    completion = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        response_format=response_format
+    )
+    return validate_response(json_loads(completion.choices[0].message.content), response_format)
+
+
+def main():
+    api_key = load_api_key()
+    if not api_key:
+        sys.exit("CEREBRAS_API_KEY not found in environment variables")
+    client = Cerebras(api_key=api_key)
+
+    DEMO_DIR.mkdir(exist_ok=True)
+    for demo_name, context in DEMO_SCENARIOS.items():
+        print(f"Precomputing '{demo_name}'...")
+        spectrum = complete(client, build_spectrum_messages(context), SPECTRUM_RESPONSE_FORMAT, SPECTRUM_MODEL)
+        simulation = complete(
+            client,
+            build_simulation_messages(context, spectrum, DEFAULT_SIMULATION_DAYS),
+            SIMULATION_RESPONSE_FORMAT,
+            SIMULATION_MODEL
+        )
+        analysis = complete(client, build_analysis_messages(context, simulation), ANALYSIS_RESPONSE_FORMAT, ANALYSIS_MODEL)
+
+        path = demo_path(demo_name)
+        # Drop results produced by older prompts/schemas
+        for stale in DEMO_DIR.glob(f"{demo_slug(demo_name)}-*.json"):
+            if stale != path:
+                stale.unlink()
+        path.write_bytes(json_dumps({
+            "context": context,
+            "spectrum": spectrum,
+            "simulation": simulation,
+            "analysis": analysis
+        }, pretty=True))
+        print(f"  -> {path.relative_to(DEMO_DIR.parent)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,214 +1,485 @@
 import streamlit as st
-import os
-from cerebras.cloud.sdk import Cerebras
+import asyncio
+import threading
+import concurrent.futures
+import hashlib
+import time
+from collections import OrderedDict
+from pathlib import Path
 import json
-import pandas as pd
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Initialize Cerebras client
+from engine import (
+    DEMO_SCENARIOS,
+    SPECTRUM_RESPONSE_FORMAT,
+    SIMULATION_RESPONSE_FORMAT,
+    ANALYSIS_RESPONSE_FORMAT,
+    DEFAULT_SIMULATION_DAYS,
+    QUALITY_MODEL,
+    SPECTRUM_MODEL,
+    SIMULATION_MODEL,
+    ANALYSIS_MODEL,
+    build_spectrum_messages,
+    build_simulation_messages,
+    build_analysis_messages,
+    load_demo,
+    json_loads,
+    json_dumps,
+    load_api_key,
+    validate_response,
+)
+
+if not load_api_key():
+    st.error("CEREBRAS_API_KEY not found in environment variables")
+    st.stop()
+
+# Keep-alive HTTP/2 pools so the TLS handshake is paid once, not on every phase's call
+HTTP_TIMEOUT = 60
+HTTP_KEEPALIVE_CONNECTIONS = 4
+HTTP_KEEPALIVE_EXPIRY = 300
+
+# Initialize Cerebras clients (the SDK is imported on first use to keep cold starts fast)
 @st.cache_resource
 def get_cerebras_client():
-    api_key = os.environ.get("CEREBRAS_API_KEY")
-    if not api_key:
-        st.error("CEREBRAS_API_KEY not found in environment variables")
-        st.stop()
-    return Cerebras(api_key=api_key)
+    import httpx
+    from cerebras.cloud.sdk import Cerebras
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+        timeout=HTTP_TIMEOUT
+    )
+    return Cerebras(api_key=load_api_key(), http_client=http_client)
 
-client = get_cerebras_client()
+@st.cache_resource
+def get_async_cerebras_client():
+    import httpx
+    from cerebras.cloud.sdk import AsyncCerebras
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+        timeout=HTTP_TIMEOUT
+    )
+    return AsyncCerebras(api_key=load_api_key(), http_client=http_client)
+
+# Long-lived event loop so speculative calls survive across Streamlit reruns
+@st.cache_resource
+def get_background_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
 
-# ==========================================
-# DEMO SCENARIOS
-# ==========================================
-DEMO_SCENARIOS = {
-    "Software Agency Crisis": {
-        "business_type": "High-end Software Agency",
-        "current_rule": "All client change requests must be approved by both the Founder (Revenue Protector) and Lead Architect (Quality Gatekeeper).",
-        "scenario": "A major client threatens to walk away if a high-risk/high-reward feature is not delivered in 7 days. The feature requires bypassing standard QA protocols."
-    },
-    "Logistics Company Fuel Crisis": {
-        "business_type": "Mid-sized Regional Logistics/Trucking Company",
-        "current_rule": "Strict driver safety policy: Mandatory 10-hour rest break for every 14 hours on duty. No exceptions.",
-        "scenario": "Fuel prices spike 40%. Major client demands 'Guaranteed 24-Hour Delivery' with strict penalty clauses. Drivers are pressured to skip rest breaks."
-    },
-    "Healthcare Staffing Shortage": {
-        "business_type": "Regional Hospital Network",
-        "current_rule": "Mandatory nurse-to-patient ratios (1:4 in general care, 1:2 in ICU). No nurse can work more than 12-hour shifts.",
-        "scenario": "Flu outbreak causes 30% staff shortage. Emergency room wait times hit 8 hours. Administration considers suspending ratio requirements."
-    },
-    "E-commerce Black Friday": {
-        "business_type": "Fast-growing E-commerce Startup",
-        "current_rule": "All marketing campaigns must be approved by Legal team for compliance (data privacy, accessibility, claims verification).",
-        "scenario": "Black Friday is in 48 hours. Marketing team has explosive viral campaign ready but Legal hasn't approved it. Competitors are already running similar campaigns."
-    },
-    "Manufacturing Quality Crisis": {
-        "business_type": "Electronics Manufacturing Plant",
-        "current_rule": "Zero-defect policy: Any product with defects must be scrapped. Quality inspectors have authority to halt production lines.",
-        "scenario": "Major retailer threatens to cancel $10M order if shipment is delayed by even 1 day. Current defect rate is 3% (normally 0.5%). Production manager wants to ship anyway."
-    }
-}
+# Re-render the live preview every N streamed chunks
+STREAM_RENDER_EVERY = 8
 
 # ==========================================
-# JSON SCHEMAS (Strict Adherence)
+# RESPONSE CACHE
 # ==========================================
+CACHE_DIR = Path(__file__).parent / ".cache"
+CACHE_TTL_SECONDS = 3600
+CACHE_MAX_ENTRIES = 256
 
-SPECTRUM_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "critical_conflict": {
-            "type": "object",
-            "properties": {
-                "psychological_prior": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "scale_description": {"type": "string"}
-                    },
-                    "required": ["name", "scale_description"],
-                    "additionalProperties": False
-                },
-                "operational_constraint": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "description": {"type": "string"}
-                    },
-                    "required": ["name", "description"],
-                    "additionalProperties": False
-                }
-            },
-            "required": ["psychological_prior", "operational_constraint"],
-            "additionalProperties": False
-        },
-        "agent_spectrum": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "agent_id": {"type": "string"},
-                    "prior_score": {"type": "integer"},
-                    "persona": {"type": "string"},
-                    "description": {"type": "string"}
-                },
-                "required": ["agent_id", "prior_score", "persona", "description"],
-                "additionalProperties": False
-            }
-        }
-    },
-    "required": ["critical_conflict", "agent_spectrum"],
-    "additionalProperties": False
-}
-
-SIMULATION_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "timeline": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "time_step": {"type": "string"},
-                    "agent_activity": {"type": "string"},
-                    "approval_status": {"type": "string"},
-                    "system_risk_score": {"type": "integer"},
-                    "narrative_outcome": {"type": "string"}
-                },
-                "required": ["time_step", "agent_activity", "approval_status", "system_risk_score", "narrative_outcome"],
-                "additionalProperties": False
-            }
-        },
-        "tipping_point": {
-            "type": "object",
-            "properties": {
-                "day": {"type": "string"},
-                "description": {"type": "string"}
-            },
-            "required": ["day", "description"],
-            "additionalProperties": False
-        }
-    },
-    "required": ["timeline", "tipping_point"],
-    "additionalProperties": False
-}
-
-ANALYSIS_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "structural_patterns": {
-            "type": "object",
-            "properties": {
-                "fracture": {"type": "string"},
-                "tipping_point": {"type": "string"},
-                "mechanism_of_failure": {"type": "string"}
-            },
-            "required": ["fracture", "tipping_point", "mechanism_of_failure"],
-            "additionalProperties": False
-        },
-        "diagnosis": {
-            "type": "object",
-            "properties": {
-                "mechanism_failure": {"type": "string"},
-                "driver_failure": {"type": "string"}
-            },
-            "required": ["mechanism_failure", "driver_failure"],
-            "additionalProperties": False
-        },
-        "proposed_solutions": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "solution_name": {"type": "string"},
-                    "description": {"type": "string"},
-                    "implementation": {"type": "string"},
-                    "prescriptive_action_plan": {"type": "string"}
-                },
-                "required": ["solution_name", "description", "implementation", "prescriptive_action_plan"],
-                "additionalProperties": False
-            }
-        }
-    },
-    "required": ["structural_patterns", "diagnosis", "proposed_solutions"],
-    "additionalProperties": False
-}
-
-def call_cerebras(messages, schema, schema_name):
-    """Call Cerebras API with strict structured output"""
+# Process-wide in-memory layer in front of the on-disk cache, oldest entry first.
+# Every session thread shares it, so all access goes through the lock.
+@st.cache_resource
+def get_response_cache():
+    return OrderedDict()
+
+@st.cache_resource
+def get_response_cache_lock():
+    return threading.Lock()
+
+def response_cache_key(messages, response_format, model):
+    schema_name = response_format["json_schema"]["name"]
+    return hashlib.sha256(json_dumps(messages, sort_keys=True) + f"{schema_name}:{model}".encode("utf-8")).hexdigest()
+
+def _remember(key, created, result):
+    cache = get_response_cache()
+    with get_response_cache_lock():
+        cache[key] = (created, result)
+        cache.move_to_end(key)
+        while len(cache) > CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+def read_cached_response(key):
+    """Return a cached result younger than CACHE_TTL_SECONDS, or None"""
+    now = time.time()
+    cache = get_response_cache()
+    with get_response_cache_lock():
+        entry = cache.get(key)
+        if entry is not None:
+            created, result = entry
+            if now - created < CACHE_TTL_SECONDS:
+                return result
+            cache.pop(key, None)
+    path = CACHE_DIR / f"{key}.json"
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b",
+        created = path.stat().st_mtime
+        if now - created >= CACHE_TTL_SECONDS:
+            path.unlink()
+            return None
+        result = json_loads(path.read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return None
+    _remember(key, created, result)
+    return result
+
+def _prune_disk_cache(now):
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            if now - path.stat().st_mtime >= CACHE_TTL_SECONDS:
+                path.unlink()
+        except OSError:
+            pass
+
+def write_cached_response(key, result):
+    now = time.time()
+    _remember(key, now, result)
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        (CACHE_DIR / f"{key}.json").write_bytes(json_dumps(result))
+        # Writes only follow real API calls, so sweeping expired files here is cheap
+        _prune_disk_cache(now)
+    except OSError:
+        pass  # The disk layer is best-effort; the in-memory copy still serves this process
+
+def call_cerebras(messages, response_format, model=QUALITY_MODEL, fresh=False):
+    """Call Cerebras API with strict structured output, streaming a live preview.
+
+    fresh=True skips the cache lookup (the new result still replaces the cached one).
+    """
+    cache_key = response_cache_key(messages, response_format, model)
+    if not fresh:
+        cached = read_cached_response(cache_key)
+        if cached is not None:
+            return cached
+    
+    placeholder = st.empty()
+    buf = []
+    try:
+        completion = get_cerebras_client().chat.completions.create(
+            model=model,
             messages=messages,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": schema_name,
-                    "strict": True,
-                    "schema": schema
-                }
-            }
+            response_format=response_format,
+            stream=True
         )
-        return json.loads(completion.choices[0].message.content)
+        for i, chunk in enumerate(completion, 1):
+            if chunk.choices:
+                buf.append(chunk.choices[0].delta.content or "")
+            if i % STREAM_RENDER_EVERY == 0:
+                placeholder.code("".join(buf), language="json")
+        result = validate_response(json_loads("".join(buf)), response_format)
+        write_cached_response(cache_key, result)
+        return result
+    except json.JSONDecodeError as e:
+        st.error(f"Cerebras returned incomplete JSON: {str(e)}")
+        return None
     except Exception as e:
         st.error(f"Error calling Cerebras API: {str(e)}")
         return None
+    finally:
+        placeholder.empty()
+
+async def call_cerebras_async(client, messages, response_format, model=QUALITY_MODEL):
+    """Async variant of call_cerebras for background calls (raises instead of rendering errors)"""
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        response_format=response_format
+    )
+    return validate_response(json_loads(completion.choices[0].message.content), response_format)
+
+def speculate(messages, response_format, model=QUALITY_MODEL, fresh=False):
+    """Start a background call on the long-lived loop and return its Future.
+
+    A cache hit (unless fresh=True) returns an already-completed Future, so callers
+    handle cached and in-flight results the same way.
+    """
+    if not fresh:
+        cached = read_cached_response(response_cache_key(messages, response_format, model))
+        if cached is not None:
+            future = concurrent.futures.Future()
+            future.set_result(cached)
+            return future
+    # Resolve the client here, on the script thread, rather than inside the coroutine
+    coro = call_cerebras_async(get_async_cerebras_client(), messages, response_format, model)
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+
+def resolve_speculation(future):
+    """Wait for a speculative call; returns None if it failed so the caller can retry live"""
+    try:
+        return future.result()
+    except Exception:
+        return None
+
+# ==========================================
+# REPORT HELPERS
+# ==========================================
+# Charts are handed to st.vega_lite_chart as ready-made specs memoized on their data,
+# skipping Streamlit's DataFrame-to-Altair inference on reruns.
+
+# The chart caches are process-wide, so cap them rather than keep one entry per run forever
+CHART_CACHE_MAX_ENTRIES = 64
+
+@st.cache_data(show_spinner=False, max_entries=CHART_CACHE_MAX_ENTRIES)
+def risk_chart_spec(points):
+    """Line chart spec for a tuple of (day, risk score) pairs"""
+    return {
+        "mark": {"type": "line", "point": True},
+        "encoding": {
+            "x": {"field": "Day", "type": "ordinal", "sort": None},
+            "y": {"field": "Risk Score", "type": "quantitative"}
+        },
+        "data": {"values": [{"Day": day, "Risk Score": risk} for day, risk in points]}
+    }
+
+@st.cache_data(show_spinner=False, max_entries=CHART_CACHE_MAX_ENTRIES)
+def prior_chart_spec(points):
+    """Bar chart spec for a tuple of (agent_id, prior score) pairs"""
+    return {
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "agent_id", "type": "nominal", "sort": None},
+            "y": {"field": "prior_score", "type": "quantitative"}
+        },
+        "data": {"values": [{"agent_id": agent_id, "prior_score": score} for agent_id, score in points]}
+    }
+
+def store_analysis(analysis):
+    """Save the analysis and drop the serialized report so it is rebuilt once.
+
+    The analysis is always the last blob written before the report is offered (every
+    path to a new spectrum or simulation starts from a cleared analysis), so resetting
+    the report here covers changes to all four.
+    """
+    st.session_state.analysis_data = analysis
+    st.session_state.report_bytes = None
+
+def get_report_bytes():
+    """Serialize the full report once per analysis, kept in this session's state"""
+    if st.session_state.report_bytes is None:
+        st.session_state.report_bytes = json_dumps({
+            "context": st.session_state.business_context,
+            "spectrum": st.session_state.spectrum_data,
+            "simulation": st.session_state.simulation_data,
+            "analysis": st.session_state.analysis_data
+        }, pretty=True)
+    return st.session_state.report_bytes
 
 # ==========================================
 # STATE MANAGEMENT
 # ==========================================
-if 'phase' not in st.session_state:
-    st.session_state.phase = 1
-if 'business_context' not in st.session_state:
-    st.session_state.business_context = {}
-if 'spectrum_data' not in st.session_state:
-    st.session_state.spectrum_data = None
-if 'simulation_data' not in st.session_state:
-    st.session_state.simulation_data = None
-if 'analysis_data' not in st.session_state:
-    st.session_state.analysis_data = None
-if 'selected_demo' not in st.session_state:
-    st.session_state.selected_demo = None
+for key, default in {
+    'phase': 1,
+    'business_context': {},
+    'spectrum_data': None,
+    'simulation_data': None,
+    'analysis_data': None,
+    'selected_demo': None,
+    'pending_simulation': None,
+    'pending_analysis': None,
+    'bypass_cache': False,
+    'report_bytes': None,
+}.items():
+    st.session_state.setdefault(key, default)
+
+# ==========================================
+# PHASE VIEWS
+# ==========================================
+# Views with widgets are fragments: interacting with them reruns only that fragment,
+# not the whole script. Display-only views have nothing to scope, so they stay plain.
+
+def spectrum_view():
+    conflict = st.session_state.spectrum_data['critical_conflict']
+    
+    st.info(f"**Conflict Detected:** {conflict['psychological_prior']['name']} vs. {conflict['operational_constraint']['name']}")
+    
+    with st.expander("📊 View Agent Spectrum Details", expanded=True):
+        agents = st.session_state.spectrum_data['agent_spectrum']
+        
+        # Simple bar chart of Prior Scores
+        st.vega_lite_chart(
+            spec=prior_chart_spec(tuple((agent['agent_id'], agent['prior_score']) for agent in agents)),
+            use_container_width=True
+        )
+        
+        # List details (one markdown element for the whole list)
+        st.markdown("\n\n".join(
+            f"**{agent['agent_id']} ({agent['persona']})**: {agent['description']} [Score: {agent['prior_score']}]"
+            for agent in agents
+        ))
+
+@st.fragment
+def simulation_controls():
+    simulation_days = st.slider("Simulation Duration (Days)", 3, 7, DEFAULT_SIMULATION_DAYS)
+    speculative_mode = st.checkbox(
+        "⚡ Speculative analysis",
+        value=True,
+        help="Start the structural analysis in the background as soon as the simulation finishes"
+    )
+    
+    if st.button("▶️ Run Simulation", type="primary"):
+        with st.spinner(f"Running {simulation_days}-day simulation..."):
+            pending = st.session_state.pending_simulation
+            st.session_state.pending_simulation = None
+            
+            messages = build_simulation_messages(
+                st.session_state.business_context,
+                st.session_state.spectrum_data,
+                simulation_days
+            )
+            
+            result = None
+            if pending is not None:
+                if simulation_days == DEFAULT_SIMULATION_DAYS:
+                    result = resolve_speculation(pending)
+                    if result:
+                        write_cached_response(response_cache_key(messages, SIMULATION_RESPONSE_FORMAT, SIMULATION_MODEL), result)
+                else:
+                    pending.cancel()
+            
+            if result is None:
+                result = call_cerebras(messages, SIMULATION_RESPONSE_FORMAT, SIMULATION_MODEL, st.session_state.bypass_cache)
+            
+            if result:
+                st.session_state.simulation_data = result
+                if speculative_mode:
+                    # The analysis needs no further input, so start it while Phase 3 renders
+                    analysis_messages = build_analysis_messages(st.session_state.business_context, result)
+                    st.session_state.pending_analysis = speculate(
+                        analysis_messages, ANALYSIS_RESPONSE_FORMAT, ANALYSIS_MODEL, st.session_state.bypass_cache
+                    )
+                st.session_state.phase = 3
+                st.rerun()
+
+def simulation_view():
+    # ----------------------------------------------------
+    # SECTION A: SIMULATION VISUALIZATION (Context)
+    # ----------------------------------------------------
+    sim = st.session_state.simulation_data
+    
+    st.subheader("📉 Step 1: Simulation Visualization")
+    st.markdown("Review the simulation log to verify the tipping point before running structural analysis.")
+    
+    # Prepare data for Risk Chart
+    risk_points = tuple((event['time_step'], event['system_risk_score']) for event in sim['timeline'])
+    
+    col_chart, col_stats = st.columns([2, 1])
+    
+    with col_chart:
+        st.caption("System Risk Score Trajectory")
+        st.vega_lite_chart(spec=risk_chart_spec(risk_points), use_container_width=True)
+        
+    with col_stats:
+        st.metric("Final Risk Score", risk_points[-1][1])
+        st.error(f"Tipping Point: {sim['tipping_point']['day']}")
+        st.caption(sim['tipping_point']['description'])
+
+    with st.expander("📖 View Full Simulation Log"):
+        st.markdown("\n\n---\n\n".join(
+            f"**{event['time_step']}** | Status: `{event['approval_status']}`\n\n{event['narrative_outcome']}"
+            for event in sim['timeline']
+        ))
+    
+    st.divider()
+
+@st.fragment
+def analysis_view():
+    # ----------------------------------------------------
+    # SECTION B: STRUCTURAL ANALYSIS (Results)
+    # ----------------------------------------------------
+    st.subheader("🧠 Step 2: Structural Analysis")
+
+    # Pick up a speculative analysis started at the end of Phase 2
+    pending = st.session_state.pending_analysis
+    if pending is not None and not st.session_state.analysis_data:
+        st.session_state.pending_analysis = None
+        with st.spinner("Finishing structural analysis..."):
+            result = resolve_speculation(pending)
+        if result:
+            messages = build_analysis_messages(
+                st.session_state.business_context,
+                st.session_state.simulation_data
+            )
+            write_cached_response(response_cache_key(messages, ANALYSIS_RESPONSE_FORMAT, ANALYSIS_MODEL), result)
+            store_analysis(result)
+            st.rerun()
+
+    # If analysis exists, show results. If not, show button.
+    if not st.session_state.analysis_data:
+        st.info("The simulation has identified a fracture point. Click below to apply the Structural Toolkit to diagnose root causes and generate fixes.")
+        
+        if st.button("🔍 Generate Structural Analysis", type="primary"):
+            with st.spinner("Applying Structural Toolkit..."):
+                messages = build_analysis_messages(
+                    st.session_state.business_context,
+                    st.session_state.simulation_data
+                )
+                
+                result = call_cerebras(messages, ANALYSIS_RESPONSE_FORMAT, ANALYSIS_MODEL, st.session_state.bypass_cache)
+                
+                if result:
+                    store_analysis(result)
+                    st.rerun()
+
+    # DISPLAY ANALYSIS RESULTS
+    if st.session_state.analysis_data:
+        analysis = st.session_state.analysis_data
+        
+        # Pattern Extraction
+        st.markdown("#### 🔬 Structural Pattern Extraction")
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Pattern", "Fracture")
+        c1.write(analysis['structural_patterns']['fracture'])
+        
+        c2.metric("Critical Moment", "Tipping Point")
+        c2.write(analysis['structural_patterns']['tipping_point'])
+        
+        c3.metric("Root Cause", "Mechanism")
+        c3.write(analysis['structural_patterns']['mechanism_of_failure'])
+        
+        st.divider()
+
+        # Diagnosis
+        st.markdown("#### 🩺 Diagnosis")
+        d1, d2 = st.columns(2)
+        with d1:
+            st.error("**Mechanism Failure**")
+            st.write(analysis['diagnosis']['mechanism_failure'])
+        with d2:
+            st.warning("**Driver Failure**")
+            st.write(analysis['diagnosis']['driver_failure'])
+            
+        st.divider()
+        
+        # Solutions
+        st.markdown("#### 💡 Proposed Structural Mutations")
+        
+        for i, solution in enumerate(analysis['proposed_solutions'], 1):
+            with st.container():
+                st.markdown(f"**{i}. {solution['solution_name']}**")
+                st.write(f"*Strategy:* {solution['description']}")
+                st.write(f"*Implementation:* {solution['implementation']}")
+                st.info(f"**🛠️ Prescriptive Action Plan:** {solution['prescriptive_action_plan']}")
+                st.divider()
+
+@st.fragment
+def report_actions():
+    col_export, col_reset = st.columns(2)
+    with col_export:
+        st.download_button(
+            "📥 Download Full Stress-Test Report",
+            data=get_report_bytes(),
+            file_name="stress_test_report.json",
+            mime="application/json"
+        )
+    with col_reset:
+        if st.button("🔄 Start New Scenario"):
+            # Stop in-flight speculative calls rather than paying for results nobody will see
+            for key in ['pending_simulation', 'pending_analysis']:
+                if st.session_state[key] is not None:
+                    st.session_state[key].cancel()
+            for key in ['spectrum_data', 'simulation_data', 'analysis_data', 'report_bytes', 'pending_simulation', 'pending_analysis']:
+                st.session_state[key] = None
+            st.session_state.phase = 1
+            st.rerun()
 
 # ==========================================
 # UI LAYOUT
@@ -239,6 +510,12 @@ with col3:
     if st.session_state.analysis_data:
         st.caption("Insights Generated")
 
+st.sidebar.toggle(
+    "High-quality spectrum",
+    key="quality_spectrum",
+    help=f"Generate the Phase 1 spectrum with {QUALITY_MODEL} instead of the faster {SPECTRUM_MODEL}"
+)
+
 st.divider()
 
 # ==========================================
@@ -250,12 +527,25 @@ if st.session_state.phase == 1:
     
     # Demo Scenario Selection
     st.subheader("📚 Try a Demo Scenario")
+    rerun_live = st.toggle(
+        "Re-run live",
+        help="Generate a fresh result instead of loading the precomputed demo report or a cached response"
+    )
     demo_cols = st.columns(5)
     
     for idx, (demo_name, demo_data) in enumerate(DEMO_SCENARIOS.items()):
         with demo_cols[idx]:
             if st.button(demo_name, key=f"demo_{idx}", use_container_width=True):
-                st.session_state.selected_demo = demo_data
+                precomputed = None if rerun_live else load_demo(demo_name)
+                if precomputed:
+                    # Jump straight to the finished report without any API calls
+                    st.session_state.business_context = precomputed["context"]
+                    st.session_state.spectrum_data = precomputed["spectrum"]
+                    st.session_state.simulation_data = precomputed["simulation"]
+                    store_analysis(precomputed["analysis"])
+                    st.session_state.phase = 3
+                else:
+                    st.session_state.selected_demo = demo_data
                 st.rerun()
     
     st.divider()
@@ -292,25 +582,16 @@ if st.session_state.phase == 1:
     
     if st.button("🔬 Generate Spectrum Analysis", type="primary", disabled=not (business_type and current_rule and scenario)):
         with st.spinner("Analyzing scenario and generating agent spectrum..."):
-            prompt = f"""You are a Complexity Analyst. Analyze the following business scenario.
-
-Business Type: {business_type}
-Current Rule: {current_rule}
-Crisis: {scenario}
-
-Task:
-1. Identify the most critical psychological Prior (belief) and Operational Constraint in conflict.
-2. Generate a spectrum of 10 agents with a bimodal distribution (4 high adherence, 4 low adherence, 2 neutral).
-3. Assign each agent a persona and prior score (1-10 scale).
-
-Output must strictly follow the JSON schema."""
-
-            messages = [
-                {"role": "system", "content": "You are a business systems analyst. Generate realistic agent profiles."},
-                {"role": "user", "content": prompt}
-            ]
+            messages = build_spectrum_messages({
+                "business_type": business_type,
+                "scenario": scenario,
+                "current_rule": current_rule
+            })
             
-            result = call_cerebras(messages, SPECTRUM_SCHEMA, "spectrum_schema")
+            # "Re-run live" bypasses the response cache for every phase of this run
+            st.session_state.bypass_cache = rerun_live
+            spectrum_model = QUALITY_MODEL if st.session_state.quality_spectrum else SPECTRUM_MODEL
+            result = call_cerebras(messages, SPECTRUM_RESPONSE_FORMAT, spectrum_model, rerun_live)
             
             if result:
                 st.session_state.spectrum_data = result
@@ -319,6 +600,11 @@ Output must strictly follow the JSON schema."""
                     "scenario": scenario,
                     "current_rule": current_rule
                 }
+                # Pre-warm the default-duration simulation while the user reviews the spectrum
+                sim_messages = build_simulation_messages(st.session_state.business_context, result, DEFAULT_SIMULATION_DAYS)
+                st.session_state.pending_simulation = speculate(
+                    sim_messages, SIMULATION_RESPONSE_FORMAT, SIMULATION_MODEL, rerun_live
+                )
                 st.session_state.phase = 2
                 st.rerun()
 
@@ -329,62 +615,9 @@ elif st.session_state.phase == 2:
     st.header("Phase 2: Dynamic Simulation")
     
     if st.session_state.spectrum_data:
-        # Spectrum Visualization
-        conflict = st.session_state.spectrum_data['critical_conflict']
-        
-        st.info(f"**Conflict Detected:** {conflict['psychological_prior']['name']} vs. {conflict['operational_constraint']['name']}")
-        
-        with st.expander("📊 View Agent Spectrum Details", expanded=True):
-            # Create a dataframe for the chart
-            agents = st.session_state.spectrum_data['agent_spectrum']
-            df_agents = pd.DataFrame(agents)
-            
-            # Simple bar chart of Prior Scores
-            st.bar_chart(df_agents.set_index('agent_id')['prior_score'])
-            
-            # List details
-            for agent in agents:
-                st.markdown(f"**{agent['agent_id']} ({agent['persona']})**: {agent['description']} [Score: {agent['prior_score']}]")
-        
+        spectrum_view()
         st.divider()
-        
-        simulation_days = st.slider("Simulation Duration (Days)", 3, 7, 5)
-        
-        if st.button("▶️ Run Simulation", type="primary"):
-            with st.spinner(f"Running {simulation_days}-day simulation..."):
-                context = st.session_state.business_context
-                spectrum = st.session_state.spectrum_data
-                
-                prompt = f"""Run a {simulation_days}-day simulation.
-
-Context: {context['business_type']} | {context['scenario']}
-Rule: {context['current_rule']}
-Conflict: {spectrum['critical_conflict']['psychological_prior']['name']} vs {spectrum['critical_conflict']['operational_constraint']['name']}
-
-Agents:
-{json.dumps(spectrum['agent_spectrum'], indent=2)}
-
-Task:
-Simulate interactions over {simulation_days} days.
-Track:
-1. Activity & Decisions
-2. Approval Status (Approved/Delayed/Bypassed)
-3. System Risk Score (Start 0. Add +2 for protests/delays, +10 for bypasses/violations).
-4. Narrative outcome.
-
-Identify the specific Tipping Point day."""
-
-                messages = [
-                    {"role": "system", "content": "You are a dynamic simulation engine. Generate time-step narratives showing risk accumulation."},
-                    {"role": "user", "content": prompt}
-                ]
-                
-                result = call_cerebras(messages, SIMULATION_SCHEMA, "simulation_schema")
-                
-                if result:
-                    st.session_state.simulation_data = result
-                    st.session_state.phase = 3
-                    st.rerun()
+        simulation_controls()
 
 # ==========================================
 # PHASE 3: ANALYSIS & VISUALIZATION
@@ -392,138 +625,11 @@ Identify the specific Tipping Point day."""
 elif st.session_state.phase == 3:
     st.header("Phase 3: Structural Insight & Solutions")
     
-    # ----------------------------------------------------
-    # SECTION A: SIMULATION VISUALIZATION (Context)
-    # ----------------------------------------------------
     if st.session_state.simulation_data:
-        sim = st.session_state.simulation_data
-        
-        st.subheader("📉 Step 1: Simulation Visualization")
-        st.markdown("Review the simulation log to verify the tipping point before running structural analysis.")
-        
-        # Prepare data for Risk Chart
-        timeline_data = []
-        for event in sim['timeline']:
-            timeline_data.append({
-                "Day": event['time_step'],
-                "Risk Score": event['system_risk_score']
-            })
-        df_risk = pd.DataFrame(timeline_data)
-        
-        col_chart, col_stats = st.columns([2, 1])
-        
-        with col_chart:
-            st.caption("System Risk Score Trajectory")
-            st.line_chart(df_risk.set_index("Day"))
-            
-        with col_stats:
-            st.metric("Final Risk Score", df_risk["Risk Score"].iloc[-1])
-            st.error(f"Tipping Point: {sim['tipping_point']['day']}")
-            st.caption(sim['tipping_point']['description'])
-
-        with st.expander("📖 View Full Simulation Log"):
-            for event in sim['timeline']:
-                st.markdown(f"**{event['time_step']}** | Status: `{event['approval_status']}`")
-                st.write(event['narrative_outcome'])
-                st.divider()
-        
-        st.divider()
-
-    # ----------------------------------------------------
-    # SECTION B: STRUCTURAL ANALYSIS (Results)
-    # ----------------------------------------------------
-    st.subheader("🧠 Step 2: Structural Analysis")
-
-    # If analysis exists, show results. If not, show button.
-    if not st.session_state.analysis_data:
-        st.info("The simulation has identified a fracture point. Click below to apply the Structural Toolkit to diagnose root causes and generate fixes.")
-        
-        if st.button("🔍 Generate Structural Analysis", type="primary"):
-            with st.spinner("Applying Structural Toolkit..."):
-                prompt = f"""Analyze this simulation log.
-
-Business: {st.session_state.business_context['business_type']}
-Simulation: {json.dumps(st.session_state.simulation_data, indent=2)}
-
-Task:
-1. Extract structural patterns (fracture, tipping point, failure mechanism).
-2. Diagnose mechanism and driver failures.
-3. Propose structural solutions. 
-CRITICAL: For each solution, provide a 'prescriptive_action_plan' containing specific metrics, bonuses, or exact rule changes (The 'How-To' layer)."""
-
-                messages = [
-                    {"role": "system", "content": "You are a structural analyst. Provide deep system diagnostics and prescriptive, actionable fixes."},
-                    {"role": "user", "content": prompt}
-                ]
-                
-                result = call_cerebras(messages, ANALYSIS_SCHEMA, "analysis_schema")
-                
-                if result:
-                    st.session_state.analysis_data = result
-                    st.rerun()
-
-    # DISPLAY ANALYSIS RESULTS
+        simulation_view()
+    analysis_view()
     if st.session_state.analysis_data:
-        analysis = st.session_state.analysis_data
-        
-        # Pattern Extraction
-        st.markdown("#### 🔬 Structural Pattern Extraction")
-        c1, c2, c3 = st.columns(3)
-        c1.metric("Pattern", "Fracture")
-        c1.write(analysis['structural_patterns']['fracture'])
-        
-        c2.metric("Critical Moment", "Tipping Point")
-        c2.write(analysis['structural_patterns']['tipping_point'])
-        
-        c3.metric("Root Cause", "Mechanism")
-        c3.write(analysis['structural_patterns']['mechanism_of_failure'])
-        
-        st.divider()
-
-        # Diagnosis
-        st.markdown("#### 🩺 Diagnosis")
-        d1, d2 = st.columns(2)
-        with d1:
-            st.error("**Mechanism Failure**")
-            st.write(analysis['diagnosis']['mechanism_failure'])
-        with d2:
-            st.warning("**Driver Failure**")
-            st.write(analysis['diagnosis']['driver_failure'])
-            
-        st.divider()
-        
-        # Solutions
-        st.markdown("#### 💡 Proposed Structural Mutations")
-        
-        for i, solution in enumerate(analysis['proposed_solutions'], 1):
-            with st.container():
-                st.markdown(f"**{i}. {solution['solution_name']}**")
-                st.write(f"*Strategy:* {solution['description']}")
-                st.write(f"*Implementation:* {solution['implementation']}")
-                st.info(f"**🛠️ Prescriptive Action Plan:** {solution['prescriptive_action_plan']}")
-                st.divider()
-        
-        # Footer Actions
-        col_export, col_reset = st.columns(2)
-        with col_export:
-            full_report = {
-                "context": st.session_state.business_context,
-                "spectrum": st.session_state.spectrum_data,
-                "simulation": st.session_state.simulation_data,
-                "analysis": st.session_state.analysis_data
-            }
-            st.download_button(
-                "📥 Download Full Stress-Test Report",
-                data=json.dumps(full_report, indent=2),
-                file_name="stress_test_report.json",
-                mime="application/json"
-            )
-        with col_reset:
-            if st.button("🔄 Start New Scenario"):
-                for key in ['spectrum_data', 'simulation_data', 'analysis_data']:
-                    st.session_state[key] = None
-                st.session_state.phase = 1
-                st.rerun()
+        report_actions()
 
 st.divider()
 st.markdown(